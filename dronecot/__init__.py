@@ -27,7 +27,9 @@ try:
         DEFAULT_MQTT_PORT,
         DEFAULT_MQTT_TOPIC,
         DEFAULT_GPS_INFO_CMD,
+        DEFAULT_GPS_INFO_TTL,
         DEFAULT_SENSOR_COT_TYPE,
+        DEFAULT_COT_RENDER_ET,
         DEFAULT_SENSOR_ID,
         DEFAULT_SENSOR_PAYLOAD_TYPE,
     )
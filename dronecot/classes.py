@@ -18,17 +18,38 @@
 
 """DroneCOT Class Definitions."""
 
-import base64
+import asyncio
+import functools
 import json
 
-from typing import Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
 
 import lzma
-import asyncio_mqtt as aiomqtt
+import aiomqtt
 
 import pytak
 import dronecot
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Leading bytes of LZMA compressed payloads: the .xz container magic, or the
+# properties byte of the default lc=3, lp=0, pb=2 that legacy .lzma streams use.
+_LZMA_MAGIC: Tuple[bytes, ...] = (b"\xfd7zXZ\x00", b"\x5d")
+# Leading bytes of plain JSON payloads: an object, possibly after whitespace.
+_JSON_START: Tuple[bytes, ...] = (b"{", b" ", b"\t", b"\r", b"\n")
+
+
+@functools.lru_cache(maxsize=1024)
+def _sensor_from_topic(topic: str) -> str:
+    """Get the sensor ID, the third level, from an MQTT topic."""
+    return topic.split("/", 3)[2]
+
 
 class MQTTWorker(pytak.QueueWorker):
     """Queue Worker for MQTT."""
@@ -37,6 +58,13 @@ class MQTTWorker(pytak.QueueWorker):
         """Initialize this class."""
         super().__init__(queue, config)
         self.sensor_positions = {}
+        # Decode UASdata off the event loop. A single thread is enough as the
+        # decoder holds the GIL, and it keeps frames in their arrival order.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="dronecot-odid"
+        )
+        # Only used from the single executor thread, so it is safe to reuse.
+        self._valid_blocks = dronecot.ODIDValidBlocks()
 
     async def handle_data(self, data: Union[dict, aiomqtt.Message]) -> None:
         """Handle Open Drone ID message from MQTT.
@@ -71,59 +99,81 @@ class MQTTWorker(pytak.QueueWorker):
 
         await self.process_payload(payload, topic)
 
-    async def decode_payload(self, payload: bytes) -> Optional[str]:
+    async def decode_payload(self, payload: bytes) -> Optional[bytes]:
         """Decode the MQTT message payload, which could be either plain JSON or LZMA compressed JSON."""
-        _payload = None
-
-        try:
-            # Not compressed
-            _payload = payload.decode()
-            # Remove newline (\n) char or \0 char as it will prevent decoding of JSON
-            if ord(payload[-1:]) in {0, 10}:
-                _payload = _payload[:-1]
-        except (UnicodeDecodeError, AttributeError):
-            # LZMA compressed
+        # Anything that isn't plain JSON could still be a legacy .lzma stream with
+        # non-default properties, so it is decompressed too.
+        if payload.startswith(_LZMA_MAGIC) or not payload.startswith(_JSON_START):
             try:
-                _payload = lzma.decompress(payload).decode()
+                payload = lzma.decompress(payload)
             except lzma.LZMAError as e:
                 self._logger.error("LZMA decompression error: %s", e)
                 return None
-            # Remove \0 char as it will prevent decoding of JSON
-            if ord(_payload[-1:]) == 0:
-                _payload = _payload[:-1]
 
-        return _payload
+        # Remove newline (\n) char or \0 char as it will prevent decoding of JSON
+        return payload.rstrip(b"\x00\n")
 
-    async def process_payload(self, payload: str, topic: str) -> None:
-        """Process the payload into individual JSON objects and handle them."""
+    async def process_payload(self, payload: bytes, topic: str) -> None:
+        """Process the payload into individual JSON objects and handle them.
+
+        Single objects are decoded with orjson, if installed. Anything it rejects,
+        like the NaN & Infinity literals the stdlib json module accepts, is decoded
+        again with the stdlib, so a payload is accepted however it was framed.
+        """
         self._logger.debug("Processing payload (%s): %s", topic, payload)
-        json_end_position = 0
-        while json_end_position != -1:
-            message_payload = payload
-
-            # Look for the next JSON object in the payload, which is (sometimes)
-            # separated by "}{". If found, split the payload at that position.
-            json_end_position = payload.find("}{")
-            if json_end_position != -1:
-                message_payload = payload[0 : json_end_position + 1]
-                # Start payload over at the next JSON object
-                payload = payload[json_end_position + 1 :]
-
-            json_obj = json.loads(message_payload)
-            json_obj["topic"] = topic
-
-            if "position" in topic:
-                await self.handle_sensor_position(json_obj)
-            elif json_obj.get("data"):
-                await self.handle_sensor_data(json_obj)
-            elif json_obj.get("status"):
-                await self.handle_sensor_status(json_obj)
+        if b"}{" not in payload:
+            try:
+                # Single JSON object, decode it straight from the payload bytes.
+                json_obj = json_loads(payload)
+            except ValueError:
+                # Several objects separated by whitespace, or JSON which only the
+                # stdlib decoder accepts (NaN), decode them below.
+                pass
+            else:
+                await self.handle_json(json_obj, topic)
+                return
+
+        # The payload holds several concatenated JSON objects ("}{"), decode them
+        # one after another in a single pass.
+        try:
+            text = payload.decode()
+        except UnicodeDecodeError as e:
+            self._logger.error("Payload is not JSON text (%s): %s", topic, e)
+            return
+
+        end = len(text)
+        idx = 0
+        while idx < end:
+            if text[idx].isspace():
+                idx += 1
+                continue
+
+            try:
+                json_obj, idx = _JSON_DECODER.raw_decode(text, idx)
+            except ValueError as e:
+                self._logger.error("Invalid JSON in payload (%s): %s", topic, e)
+                return
+
+            await self.handle_json(json_obj, topic)
+            # Let other MQTT reads and the RIDWorker run between objects of a
+            # large payload instead of stalling the loop until it is all parsed.
+            await asyncio.sleep(0)
+
+    async def handle_json(self, json_obj: dict, topic: str) -> None:
+        """Handle a JSON object decoded from an MQTT message on the given topic."""
+        json_obj["topic"] = topic
+
+        if "position" in topic:
+            await self.handle_sensor_position(json_obj)
+        elif json_obj.get("data"):
+            await self.handle_sensor_data(json_obj)
+        elif json_obj.get("status"):
+            await self.handle_sensor_status(json_obj)
 
     async def handle_sensor_position(self, message):
         """Process sensor position messages."""
         self._logger.debug("Handling sensor position message: %s", message)
-        topic = message.get("topic")
-        sensor = topic.split("/")[2]
+        sensor = _sensor_from_topic(message.get("topic"))
         self.sensor_positions[sensor] = {
             "sensor_id": sensor,
             "lat": message.get("lat"),
@@ -155,10 +205,12 @@ class MQTTWorker(pytak.QueueWorker):
             self._logger.error("No UASdata in message")
             return
 
-        uasdata = base64.b64decode(uasdata)
-
-        valid_blocks = dronecot.decode_valid_blocks(uasdata, dronecot.ODIDValidBlocks())
-        pl = dronecot.parse_payload(uasdata, valid_blocks)
+        pl = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            dronecot.functions.decode_uasdata,
+            uasdata,
+            self._valid_blocks,
+        )
         del data["UASdata"]
         pl["data"] = data
         pl["topic"] = message["topic"]
@@ -173,11 +225,10 @@ class MQTTWorker(pytak.QueueWorker):
             self._logger.error("No status in message")
             return
 
-        topic = message["topic"]
-        sensor = topic.split("/")[2]
+        sensor = _sensor_from_topic(message["topic"])
 
         position = self.sensor_positions.get(sensor) or {}
-        pl = position | message
+        pl = {**position, **message}
         del pl["topic"]
         pl["sensor_id"] = sensor
         self._logger.info("Publishing status for sensor: %s", sensor)
@@ -199,20 +250,26 @@ class MQTTWorker(pytak.QueueWorker):
         if self.config.get("MQTT_TLS_CLIENT_CERT"):
             ssl_ctx = pytak.client_functions.get_ssl_ctx(self.config)
 
-        async with aiomqtt.Client(
-            hostname=broker,
-            port=port,
-            username=mqtt_username or None,
-            password=mqtt_password or None,
-            client_id=client_id,
-            tls_context=ssl_ctx,
-        ) as client:
-            self._logger.info("Connected to MQTT Broker %s:%d/%s", broker, port, topic)
-            async with client.messages() as messages:
+        try:
+            async with aiomqtt.Client(
+                hostname=broker,
+                port=port,
+                username=mqtt_username or None,
+                password=mqtt_password or None,
+                identifier=client_id,
+                tls_context=ssl_ctx,
+                max_inflight_messages=1000,
+            ) as client:
+                self._logger.info(
+                    "Connected to MQTT Broker %s:%d/%s", broker, port, topic
+                )
                 await client.subscribe(topic)
-                async for message in messages:
+                async for message in client.messages:
                     self._logger.debug("Received MQTT message: %s", message)
                     await self.handle_data(message)
+        finally:
+            # Don't leave the decoder thread behind this worker.
+            self._executor.shutdown(wait=False)
 
 
 class RIDWorker(pytak.QueueWorker):
@@ -223,6 +280,63 @@ class RIDWorker(pytak.QueueWorker):
         super().__init__(queue, config)
         self.net_queue = net_queue
         self.config = config
+        # Renderers with the CoT config resolved once, not for every event.
+        self._cot_config = dronecot.functions.cot_config(config)
+        self._sensor_status_to_cot = dronecot.functions.cot_renderer(
+            "sensor_status_to_cot", self._cot_config
+        )
+        self._rid_uas_to_cot = dronecot.functions.cot_renderer(
+            "rid_uas_to_cot_xml", self._cot_config
+        )
+        self._rid_op_to_cot = dronecot.functions.cot_renderer(
+            "rid_op_to_cot_xml", self._cot_config
+        )
+        self._gps_refresh: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _is_status(data: dict) -> bool:
+        """Check if the given data is a sensor status, rather than a RID frame."""
+        return "status" in data and "position" not in data.get("topic", "")
+
+    def _refresh_gps_info(self) -> None:
+        """Refresh the cached GPS fix in the background, one refresh at a time."""
+        if self._gps_refresh is None or self._gps_refresh.done():
+            self._gps_refresh = asyncio.create_task(
+                dronecot.functions.refresh_gps_info(self._cot_config)
+            )
+
+    def _locate_status(self, data: dict) -> Optional[dict]:
+        """Give a status from a sensor without a position the cached GPS fix."""
+        if data.get("lat") is not None and data.get("lon") is not None:
+            return data
+
+        self._refresh_gps_info()
+        gps_info = dronecot.functions.cached_gps_info() or {}
+        if gps_info.get("lat") is None or gps_info.get("lon") is None:
+            self._logger.debug("No GPS fix (yet) for status: %s", data)
+            return None
+
+        return {
+            **data,
+            "lat": gps_info["lat"],
+            "lon": gps_info["lon"],
+            "altHAE": gps_info.get("altHAE", data.get("altHAE")),
+        }
+
+    def render_events(
+        self, data: dict, times: Optional[Tuple[str, str]] = None
+    ) -> List[bytes]:
+        """Render the CoT Events for the given data from the receiver."""
+        self._logger.debug("Handling data: %s", data)
+
+        if self._is_status(data):
+            events = [self._sensor_status_to_cot(data, times)]
+        else:
+            events = [
+                self._rid_uas_to_cot(data, times),
+                self._rid_op_to_cot(data, times),
+            ]
+        return [event for event in events if event]
 
     async def handle_data(self, data: dict) -> None:
         """Handle Data from receiver: Render to CoT, put on TX queue.
@@ -232,28 +346,41 @@ class RIDWorker(pytak.QueueWorker):
         data : `list[dict, ]`
             List of craft data as key/value arrays.
         """
-        self._logger.debug("Handling data: %s", data)
-
-        if "status" in data and "position" not in data.get("topic", ""):
-            event = dronecot.xml_to_cot(data, self.config, "sensor_status_to_cot")
+        await self.handle_batch([data])
+
+    async def handle_batch(self, batch: list) -> None:
+        """Render a batch of data from the receiver to CoT, put it on TX queue."""
+        # Status from sensors without a position fall back to the GPS fix, which
+        # is refreshed in the background, so rendering never waits on GPS_INFO_CMD.
+        batch = [
+            self._locate_status(data) if self._is_status(data) else data
+            for data in batch
+            if data
+        ]
+
+        # Render the whole batch with the same time stamps, then queue it.
+        times = dronecot.functions.cot_times(self._cot_config["COT_STALE"])
+        events = [
+            event for data in batch if data for event in self.render_events(data, times)
+        ]
+        for event in events:
             await self.put_queue(event)
-        else:
-            uas_event: Optional[bytes] = dronecot.xml_to_cot(
-                data, self.config, "rid_uas_to_cot_xml"
-            )
-            op_event: Optional[bytes] = dronecot.xml_to_cot(
-                data, self.config, "rid_op_to_cot_xml"
-            )
-            await self.put_queue(uas_event)
-            await self.put_queue(op_event)
 
     async def run(self, _=-1) -> None:
         """Run the main process loop."""
         self._logger.info("Running RIDWorker")
 
-        while 1:
-            data = await self.net_queue.get()
-            if not data:
-                continue
-
-            await self.handle_data(data)
+        net_queue = self.net_queue
+        try:
+            while 1:
+                batch = [await net_queue.get()]
+                # Drain whatever else is already queued, so a burst of frames is
+                # rendered without a loop round-trip per frame.
+                while len(batch) < 32 and not net_queue.empty():
+                    batch.append(net_queue.get_nowait())
+
+                await self.handle_batch(batch)
+        finally:
+            # Kill a GPS_INFO_CMD still running for this worker.
+            if self._gps_refresh is not None and not self._gps_refresh.done():
+                self._gps_refresh.cancel()
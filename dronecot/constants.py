@@ -22,7 +22,9 @@ DEFAULT_MQTT_BROKER: str = "localhost"
 DEFAULT_MQTT_PORT: int = 1883
 DEFAULT_MQTT_TOPIC: str = "#"
 DEFAULT_GPS_INFO_CMD: str = "gpspipe --json -n 5"
+DEFAULT_GPS_INFO_TTL: int = 10
 DEFAULT_SENSOR_COT_TYPE: str = "a-f-G-E-S-E"
+DEFAULT_COT_RENDER_ET: bool = False
 
 DEFAULT_SENSOR_ID: str = "Uknown-Sensor-ID"
 DEFAULT_SENSOR_PAYLOAD_TYPE: str = "Uknown-Sensor-Payload-Type"
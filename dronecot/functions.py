@@ -19,22 +19,41 @@
 """DroneCOT Functions."""
 
 import asyncio
-import base64
-import json
+import datetime
+import functools
+import logging
+import os
+import signal
 import subprocess
+import time
 import xml.etree.ElementTree as ET
 
+from binascii import a2b_base64
 from configparser import SectionProxy
-from typing import Optional, Set, Union
+from typing import Callable, Optional, Tuple, Union
+from xml.sax.saxutils import escape
 
 import pytak
 import dronecot
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 APP_NAME = "dronecot"
 
+_LOGGER = logging.getLogger(__name__)
+
+# Last GPS Info read by get_gps_info(), and when it was read.
+_GPS_INFO_CACHE: dict = {"ts": float("-inf"), "info": None}
+_POSIX: bool = os.name == "posix"
+
 
-def create_tasks(config: SectionProxy, clitool: pytak.CLITool) -> Set[pytak.Worker,]:
-    """Create specific coroutine task set for this application.
+def create_tasks(
+    config: SectionProxy, clitool: pytak.CLITool
+) -> Tuple[pytak.Worker, ...]:
+    """Create specific coroutine tasks for this application.
 
     Parameters
     ----------
@@ -45,17 +64,15 @@ def create_tasks(config: SectionProxy, clitool: pytak.CLITool) -> Set[pytak.Work
 
     Returns
     -------
-    `set`
-        Set of PyTAK Worker classes for this application.
+    `tuple`
+        Tuple of PyTAK Worker classes for this application.
     """
-    tasks = set()
-
     net_queue: asyncio.Queue = asyncio.Queue()
 
-    tasks.add(dronecot.MQTTWorker(net_queue, config))
-    tasks.add(dronecot.RIDWorker(clitool.tx_queue, net_queue, config))
-
-    return tasks
+    return (
+        dronecot.MQTTWorker(net_queue, config),
+        dronecot.RIDWorker(clitool.tx_queue, net_queue, config),
+    )
 
 
 # {'AltitudeBaro': nan,
@@ -92,90 +109,196 @@ def create_tasks(config: SectionProxy, clitool: pytak.CLITool) -> Set[pytak.Work
 #  'VertAccuracy': 4}
 
 
-def rid_op_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,too-many-statements
-    data: dict,
-    config: Union[SectionProxy, dict, None] = None,
-) -> Optional[ET.Element]:
+def cot_config(config: Union[SectionProxy, dict]) -> dict:
+    """Resolve the config options used to render CoT Events, with defaults.
+
+    Rendering from the returned dict skips the per-event SectionProxy lookups,
+    fallback defaults & int() conversion. Resolving a resolved dict is harmless.
     """
-    Serialize Open Drone ID data as Cursor on Target.
+    render_et = config.get("COT_RENDER_ET", dronecot.DEFAULT_COT_RENDER_ET)
+    return {
+        "COT_STALE": int(config.get("COT_STALE", pytak.DEFAULT_COT_STALE)),
+        "COT_HOST_ID": config.get("COT_HOST_ID", pytak.DEFAULT_HOST_ID),
+        "COT_ACCESS": config.get("COT_ACCESS", pytak.DEFAULT_COT_ACCESS),
+        "SENSOR_ID": config.get("SENSOR_ID", dronecot.DEFAULT_SENSOR_ID),
+        "SENSOR_COT_TYPE": config.get(
+            "SENSOR_COT_TYPE", dronecot.DEFAULT_SENSOR_COT_TYPE
+        ),
+        "GPS_INFO_CMD": config.get("GPS_INFO_CMD", dronecot.DEFAULT_GPS_INFO_CMD),
+        "GPS_INFO_TTL": config.get("GPS_INFO_TTL", dronecot.DEFAULT_GPS_INFO_TTL),
+        "COT_RENDER_ET": str(render_et).lower() in ("1", "true", "yes", "on"),
+    }
 
-    Parameters
-    ----------
-    craft : `dict`
-        Key/Value data struct of decoded ADS-B aircraft data.
-    config : `configparser.SectionProxy`
-        Configuration options and values.
-        Uses config options: UID_KEY, COT_STALE, COT_HOST_ID
-    kown_craft : `dict`
-        Optional list of know craft to transform CoT data.
 
-    Returns
-    -------
-    `xml.etree.ElementTree.Element`
-        Cursor-On-Target XML ElementTree object.
-    """
+def _rid_op_fields(data: dict, config: dict) -> Optional[dict]:
+    """Resolve the values of an Open Drone ID Operator CoT Event."""
     lat = data.get("OperatorLatitude")
     lon = data.get("OperatorLongitude")
 
     if lat is None or lon is None:
         return None
 
-    config = config or {}
-    remarks_fields: list = []
+    uasid = data.get("BasicID") or data.get("BasicID_0") or "Unknown-BasicID_0"
+    op_id = data.get("OperatorID", uasid)
+
+    cot_host_id: str = config["COT_HOST_ID"]
+
+    return {
+        "uid": f"RID.{uasid}.op",
+        "cot_type": "a-n-G",
+        "stale": config["COT_STALE"],
+        "access": config["COT_ACCESS"],
+        "lat": lat,
+        "lon": lon,
+        "ce": data.get("HorizAccuracy", "9999999.0"),
+        "le": data.get("VertAccuracy", "9999999.0"),
+        "hae": data.get("OperatorAltitudeGeo", "9999999.0"),
+        "callsign": op_id,
+        "host_id": cot_host_id,
+        "op_id": op_id,
+        "remarks": f"UAS ID={uasid} OperatorID={op_id} {cot_host_id}",
+    }
+
+
+def _rid_uas_fields(data: dict, config: dict) -> Optional[dict]:
+    """Resolve the values of an Open Drone ID UAS CoT Event."""
+    lat = data.get("Latitude")
+    lon = data.get("Longitude")
+
+    if lat is None or lon is None:
+        return None
+
+    src_data = data.get("data", {})
 
-    uasid = data.get("BasicID", data.get("BasicID_0", "Unknown-BasicID_0"))
+    uasid = data.get("BasicID") or data.get("BasicID_0") or "Unknown-BasicID_0"
     op_id = data.get("OperatorID", uasid)
 
-    cot_uid: str = f"RID.{uasid}.op"
-    cot_type: str = "a-n-G"
+    cot_host_id: str = config["COT_HOST_ID"]
 
-    cot_stale: int = int(config.get("COT_STALE", pytak.DEFAULT_COT_STALE))
-    cot_host_id: str = config.get("COT_HOST_ID", pytak.DEFAULT_HOST_ID)
+    # Sensors report their ID as "sensor ID", alongside "MAC address" et al.
+    sensor_id = (
+        src_data.get("sensor_id")
+        or src_data.get("sensor ID")
+        or dronecot.DEFAULT_SENSOR_ID
+    )
 
-    cotx = ET.Element("_dronecot_")
-    cotx.set("cot_host_id", cot_host_id)
+    return {
+        "uid": f"RID.{uasid}.uas",
+        "cot_type": "a-n-A-M-H-Q",
+        "stale": config["COT_STALE"],
+        "access": config["COT_ACCESS"],
+        "lat": lat,
+        "lon": lon,
+        "ce": data.get("HorizAccuracy", "9999999.0"),
+        "le": data.get("VertAccuracy", "9999999.0"),
+        "hae": data.get("AltitudeGeo", "9999999.0"),
+        "callsign": uasid,
+        "speed": data.get("SpeedHorizontal", 0),
+        "op_uid": f"RID.{op_id}.op",
+        "op_id": op_id,
+        "uasid": uasid,
+        "sensor_id": sensor_id,
+        "rssi": src_data.get("RSSI"),
+        "channel": src_data.get("channel"),
+        "timestamp": src_data.get("timestamp"),
+        "mac_address": src_data.get("MAC address"),
+        "payload_type": src_data.get("type", dronecot.DEFAULT_SENSOR_PAYLOAD_TYPE),
+        "host_id": cot_host_id,
+        "remarks": f"UAS: {uasid} Operator: {op_id} {cot_host_id}",
+    }
 
-    remarks_fields.append(f"UAS ID={uasid} OperatorID={op_id}")
-    cotx.set("OperatorID", op_id)
-    cotx.set("UASID", op_id)
-    callsign = op_id
 
-    contact: ET.Element = ET.Element("contact")
-    contact.set("callsign", callsign)
+def _sensor_status_fields(data: dict, config: dict) -> Optional[dict]:
+    """Resolve the values of a sensor status CoT Event."""
+    lat = data.get("lat")
+    lon = data.get("lon")
+    hae = data.get("altHAE")
+    status = data.get("status") or {}
 
-    detail = ET.Element("detail")
-    detail.append(contact)
-    detail.append(cotx)
+    if lat is None or lon is None:
+        gps_info = None
+        try:
+            gps_info = get_gps_info(config)
+        except Exception as e:
+            _LOGGER.warning("Unable to get GPS fix: %s", e)
+        if not gps_info:
+            return None
+        lat = gps_info.get("lat")
+        lon = gps_info.get("lon")
+        hae = gps_info.get("altHAE", hae)
 
-    remarks = ET.Element("remarks")
-    remarks_fields.append(f"{cot_host_id}")
-    _remarks = " ".join(list(filter(None, remarks_fields)))
-    remarks.text = _remarks
-    detail.append(remarks)
+    if lat is None or lon is None:
+        return None
 
+    sensor_id = data.get("sensor_id", config["SENSOR_ID"])
+
+    cot_host_id: str = config["COT_HOST_ID"]
+
+    return {
+        "uid": f"SNSTAC-CUAS.{sensor_id}",
+        "cot_type": config["SENSOR_COT_TYPE"],
+        "stale": config["COT_STALE"],
+        "access": config["COT_ACCESS"],
+        "lat": lat,
+        "lon": lon,
+        "ce": data.get("HorizAccuracy", "9999999.0"),
+        "le": data.get("VertAccuracy", "9999999.0"),
+        "hae": hae if hae is not None else "9999999.0",
+        "callsign": sensor_id,
+        "speed": data.get("SpeedHorizontal", 0),
+        "host_id": cot_host_id,
+        "sensor_id": sensor_id,
+        "remarks": (
+            f"SNSTAC C-UAS Sensor {sensor_id} - {status.get('model')} "
+            f"{status.get('status')} - Contact: info@snstac.com 415-598-8226 "
+            f"{cot_host_id}"
+        ),
+    }
+
+
+def _gen_cot_xml(fields: dict, detail: ET.Element) -> ET.Element:
+    """Generate a CoT Event from the given fields, replacing its detail."""
     cot_d = {
-        "lat": str(lat),
-        "lon": str(lon),
-        "ce": str(data.get("HorizAccuracy", "9999999.0")),
-        "le": str(data.get("VertAccuracy", "9999999.0")),
-        "hae": str(data.get("OperatorAltitudeGeo", "9999999.0")),
-        "uid": cot_uid,
-        "cot_type": cot_type,
-        "stale": cot_stale,
+        "lat": str(fields["lat"]),
+        "lon": str(fields["lon"]),
+        "ce": str(fields["ce"]),
+        "le": str(fields["le"]),
+        "hae": str(fields["hae"]),
+        "uid": fields["uid"],
+        "cot_type": fields["cot_type"],
+        "stale": fields["stale"],
     }
     cot = pytak.gen_cot_xml(**cot_d)
-    cot.set("access", config.get("COT_ACCESS", pytak.DEFAULT_COT_ACCESS))
+    cot.set("access", fields["access"])
+    # Newer pytak rounds lat & lon, keep the precision the templates render with.
+    point = cot.find("point")
+    for key in ("lat", "lon", "ce", "le", "hae"):
+        point.set(key, cot_d[key])
 
-    _detail = cot.findall("detail")[0]
-    flowtags = _detail.findall("_flow-tags_")
-    detail.extend(flowtags)
-    cot.remove(_detail)
-    cot.append(detail)
+    # Stamp links with the event's own time rather than formatting another one.
+    for link in detail.iter("link"):
+        link.set("production_time", cot.get("time"))
+
+    ET.SubElement(detail, "remarks").text = fields["remarks"]
 
+    _replace_detail(cot, detail)
     return cot
 
 
-def rid_uas_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,too-many-statements
+def _replace_detail(cot: ET.Element, detail: ET.Element) -> None:
+    """Swap the CoT Event's detail for the given one in its slot.
+
+    pytak's flow-tags are carried over into the given detail.
+    """
+    for idx, child in enumerate(cot):
+        if child.tag == "detail":
+            detail.extend(child.findall("_flow-tags_"))
+            cot[idx] = detail
+            return
+    cot.append(detail)
+
+
+def rid_op_to_cot_xml(
     data: dict,
     config: Union[SectionProxy, dict, None] = None,
 ) -> Optional[ET.Element]:
@@ -184,227 +307,403 @@ def rid_uas_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branche
 
     Parameters
     ----------
-    craft : `dict`
-        Key/Value data struct of decoded ADS-B aircraft data.
+    data : `dict`
+        Key/Value data struct of decoded Open Drone ID data.
     config : `configparser.SectionProxy`
         Configuration options and values.
-        Uses config options: UID_KEY, COT_STALE, COT_HOST_ID
-    kown_craft : `dict`
-        Optional list of know craft to transform CoT data.
+        Uses config options: COT_STALE, COT_HOST_ID, COT_ACCESS
 
     Returns
     -------
     `xml.etree.ElementTree.Element`
         Cursor-On-Target XML ElementTree object.
     """
-    lat = data.get("Latitude")
-    lon = data.get("Longitude")
-
-    if lat is None or lon is None:
+    fields = _rid_op_fields(data, cot_config(config or {}))
+    if fields is None:
         return None
 
-    config = config or {}
-    remarks_fields: list = []
-    src_data = data.get("data", {})
+    detail = ET.Element("detail")
+    ET.SubElement(detail, "contact", {"callsign": fields["callsign"]})
+    ET.SubElement(
+        detail,
+        "_dronecot_",
+        {
+            "cot_host_id": fields["host_id"],
+            "OperatorID": fields["op_id"],
+            "UASID": fields["op_id"],
+        },
+    )
 
-    uasid = data.get("BasicID", data.get("BasicID_0", "Unknown-BasicID_0"))
-    op_id = data.get("OperatorID", uasid)
-    op_uid = f"RID.{op_id}.op"
+    return _gen_cot_xml(fields, detail)
 
-    cot_uid: str = f"RID.{uasid}.uas"
-    cot_type: str = "a-n-A-M-H-Q"
 
-    cot_stale: int = int(config.get("COT_STALE", pytak.DEFAULT_COT_STALE))
-    cot_host_id: str = config.get("COT_HOST_ID", pytak.DEFAULT_HOST_ID)
+def rid_uas_to_cot_xml(
+    data: dict,
+    config: Union[SectionProxy, dict, None] = None,
+) -> Optional[ET.Element]:
+    """
+    Serialize Open Drone ID data as Cursor on Target.
 
-    remarks_fields.append(f"UAS: {uasid}")
-    remarks_fields.append(f"Operator: {op_id}")
+    Parameters
+    ----------
+    data : `dict`
+        Key/Value data struct of decoded Open Drone ID data.
+    config : `configparser.SectionProxy`
+        Configuration options and values.
+        Uses config options: COT_STALE, COT_HOST_ID, COT_ACCESS
 
-    callsign = uasid
+    Returns
+    -------
+    `xml.etree.ElementTree.Element`
+        Cursor-On-Target XML ElementTree object.
+    """
+    fields = _rid_uas_fields(data, cot_config(config or {}))
+    if fields is None:
+        return None
 
-    contact: ET.Element = ET.Element("contact")
-    contact.set("callsign", callsign)
+    detail = ET.Element("detail")
+    ET.SubElement(detail, "contact", {"callsign": fields["callsign"]})
+    ET.SubElement(detail, "track", {"speed": str(fields["speed"])})
+    ET.SubElement(
+        detail,
+        "link",
+        {
+            "uid": fields["op_uid"],
+            "type": "a-n-G",
+            "parent_callsign": fields["op_id"],
+            "relation": "p-p",
+        },
+    )
+    ET.SubElement(
+        detail,
+        "__cuas",
+        {
+            "sensor_id": fields["sensor_id"],
+            "rssi": str(fields["rssi"]),
+            "channel": str(fields["channel"]),
+            "timestamp": str(fields["timestamp"]),
+            "mac_address": str(fields["mac_address"]),
+            "type": str(fields["payload_type"]),
+            "host_id": fields["host_id"],
+            "rid_op": fields["op_id"],
+            "rid_uas": fields["uasid"],
+        },
+    )
 
-    track: ET.Element = ET.Element("track")
-    track.set("speed", str(data.get("SpeedHorizontal", 0)))
+    return _gen_cot_xml(fields, detail)
 
-    link: ET.Element = ET.Element("link")
-    link.set("uid", op_uid)
-    link.set("production_time", pytak.cot_time())
-    link.set("type", "a-n-G")
-    link.set("parent_callsign", op_id)
-    link.set("relation", "p-p")
 
-    cuas: ET.Element = ET.Element("__cuas")
-    sensor_id = src_data.get(
-        "sensor_id", src_data.get("sensor_id", dronecot.DEFAULT_SENSOR_ID)
-    )
-    cuas.set("sensor_id", sensor_id)
-    cuas.set("rssi", str(src_data.get("RSSI")))
-    cuas.set("channel", str(src_data.get("channel")))
-    cuas.set("timestamp", str(src_data.get("timestamp")))
-    cuas.set("mac_address", str(src_data.get("MAC address")))
-    cuas.set("type", str(src_data.get("type", dronecot.DEFAULT_SENSOR_PAYLOAD_TYPE)))
-    cuas.set("host_id", cot_host_id)
-    cuas.set("rid_op", op_id)
-    cuas.set("rid_uas", uasid)
+def sensor_status_to_cot(
+    data: dict,
+    config: Union[SectionProxy, dict, None] = None,
+) -> Optional[ET.Element]:
+    """Serialize sensor status data as Cursor on Target."""
+    fields = _sensor_status_fields(data, cot_config(config or {}))
+    if fields is None:
+        return None
 
     detail = ET.Element("detail")
-    detail.append(contact)
-    detail.append(track)
-    detail.append(link)
-    detail.append(cuas)
-
-    remarks = ET.Element("remarks")
-    remarks_fields.append(f"{cot_host_id}")
-    _remarks = " ".join(list(filter(None, remarks_fields)))
-    remarks.text = _remarks
-    detail.append(remarks)
+    ET.SubElement(detail, "contact", {"callsign": fields["callsign"]})
+    ET.SubElement(detail, "track", {"speed": str(fields["speed"])})
+    ET.SubElement(
+        detail,
+        "_dronecot_",
+        {"cot_host_id": fields["host_id"], "sensor_id": fields["sensor_id"]},
+    )
 
-    cot_d = {
-        "lat": str(lat),
-        "lon": str(lon),
-        "ce": str(data.get("HorizAccuracy", "9999999.0")),
-        "le": str(data.get("VertAccuracy", "9999999.0")),
-        "hae": str(data.get("AltitudeGeo", "9999999.0")),
-        "uid": cot_uid,
-        "cot_type": cot_type,
-        "stale": cot_stale,
-    }
-    cot = pytak.gen_cot_xml(**cot_d)
-    cot.set("access", config.get("COT_ACCESS", pytak.DEFAULT_COT_ACCESS))
+    return _gen_cot_xml(fields, detail)
+
+
+# String templates of the CoT Events rendered by this module, these produce the
+# same documents as the ElementTree builders above without building a tree.
+_EVENT_HEAD: str = (
+    pytak.DEFAULT_XML_DECLARATION.decode()
+    + "\n"
+    + '<event version="2.0" type="{cot_type}" uid="{uid}" how="m-g" '
+    'time="{time}" start="{time}" stale="{stale}" access="{access}">'
+    '<point lat="{lat}" lon="{lon}" le="{le}" hae="{hae}" ce="{ce}" />'
+    "<detail>"
+)
+_EVENT_TAIL: str = (
+    "<remarks>{remarks}</remarks>"
+    '<_flow-tags_ {flow_tag}="{time}" />'
+    "</detail></event>"
+)
+
+_OP_TMPL: str = (
+    _EVENT_HEAD + '<contact callsign="{callsign}" />'
+    '<_dronecot_ cot_host_id="{host_id}" OperatorID="{op_id}" UASID="{op_id}" />'
+    + _EVENT_TAIL
+)
+_UAS_TMPL: str = (
+    _EVENT_HEAD + '<contact callsign="{callsign}" />'
+    '<track speed="{speed}" />'
+    '<link uid="{op_uid}" production_time="{time}" type="a-n-G" '
+    'parent_callsign="{op_id}" relation="p-p" />'
+    '<__cuas sensor_id="{sensor_id}" rssi="{rssi}" channel="{channel}" '
+    'timestamp="{timestamp}" mac_address="{mac_address}" type="{payload_type}" '
+    'host_id="{host_id}" rid_op="{op_id}" rid_uas="{uasid}" />' + _EVENT_TAIL
+)
+_SENSOR_TMPL: str = (
+    _EVENT_HEAD + '<contact callsign="{callsign}" />'
+    '<track speed="{speed}" />'
+    '<_dronecot_ cot_host_id="{host_id}" sensor_id="{sensor_id}" />' + _EVENT_TAIL
+)
+
+
+def _pytak_flow_tag() -> str:
+    """Get the _flow-tags_ attribute the installed pytak stamps CoT Events with."""
+    flow_tags = pytak.gen_cot_xml().find("detail/_flow-tags_")
+    # Older pytak kept the "@" of its host ID, which isn't valid in an XML name.
+    return next(iter(flow_tags.attrib)).replace("@", "-")
+
+
+_FLOW_TAG: str = _pytak_flow_tag()
+_XML_ENTITIES: dict = {'"': "&quot;"}
+
+
+def cot_times(stale: int) -> Tuple[str, str]:
+    """Get the time & stale time of a CoT Event created now, stale after stale secs.
+
+    A batch of CoT Events can be rendered with the same times.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return (
+        now.strftime(pytak.W3C_XML_DATETIME),
+        (now + datetime.timedelta(seconds=stale)).strftime(pytak.W3C_XML_DATETIME),
+    )
 
-    _detail = cot.findall("detail")[0]
-    flowtags = _detail.findall("_flow-tags_")
-    detail.extend(flowtags)
-    cot.remove(_detail)
-    cot.append(detail)
 
-    return cot
+def _render_cot(
+    template: str, fields: dict, times: Optional[Tuple[str, str]] = None
+) -> bytes:
+    """Render the given CoT Event template with the given fields."""
+    values = {key: escape(str(value), _XML_ENTITIES) for key, value in fields.items()}
+    values["time"], values["stale"] = times or cot_times(fields["stale"])
+    values["flow_tag"] = _FLOW_TAG
+    return template.format_map(values).encode()
 
 
-def sensor_status_to_cot(  # NOQA pylint: disable=too-many-locals,too-many-branches,too-many-statements
+def _render_event(
+    template: str,
+    resolve_fields: Callable,
+    config: dict,
     data: dict,
-    config: Union[SectionProxy, dict, None] = None,
-) -> Optional[ET.Element]:
-    """Serialize sensor status data as Cursor on Target."""
-    config = config or {}
-    lat = data.get("lat")
-    lon = data.get("lon")
-    hae = data.get("altHAE")
-    status = data.get("status") or {}
-
-    if lat is None or lon is None:
-        gps_info = None
-        try:
-            gps_info = get_gps_info(config)
-        except Exception as e:
-            print(f"Unable to get GPS fix: {e}")
-        if not gps_info:
-            return None
-
-    if lat is None or lon is None:
-        return None
+    times: Optional[Tuple[str, str]] = None,
+) -> Optional[bytes]:
+    """Render a CoT Event template with the fields resolved from data & config."""
+    fields = resolve_fields(data, config)
+    return _render_cot(template, fields, times) if fields else None
 
-    config = config or {}
-    remarks_fields: list = []
 
-    sensor_id = data.get(
-        "sensor_id", config.get("SENSOR_ID", dronecot.DEFAULT_SENSOR_ID)
-    )
+def rid_op_to_cot_bytes(
+    data: dict,
+    config: Union[SectionProxy, dict, None] = None,
+) -> Optional[bytes]:
+    """Serialize Open Drone ID Operator data as Cursor on Target XML bytes."""
+    return _render_event(_OP_TMPL, _rid_op_fields, cot_config(config or {}), data)
 
-    cot_uid: str = f"SNSTAC-CUAS.{sensor_id}"
-    cot_type: str = config.get("SENSOR_COT_TYPE", dronecot.DEFAULT_SENSOR_COT_TYPE)
 
-    cot_stale: int = int(config.get("COT_STALE", pytak.DEFAULT_COT_STALE))
-    cot_host_id: str = config.get("COT_HOST_ID", pytak.DEFAULT_HOST_ID)
+def rid_uas_to_cot_bytes(
+    data: dict,
+    config: Union[SectionProxy, dict, None] = None,
+) -> Optional[bytes]:
+    """Serialize Open Drone ID UAS data as Cursor on Target XML bytes."""
+    return _render_event(_UAS_TMPL, _rid_uas_fields, cot_config(config or {}), data)
 
-    cotx = ET.Element("_dronecot_")
-    cotx.set("cot_host_id", cot_host_id)
 
-    remarks_fields.append(
-        f"SNSTAC C-UAS Sensor {sensor_id} - {status.get('model')} "
-        f"{status.get('status')} - Contact: info@snstac.com 415-598-8226"
+def sensor_status_to_cot_bytes(
+    data: dict,
+    config: Union[SectionProxy, dict, None] = None,
+) -> Optional[bytes]:
+    """Serialize sensor status data as Cursor on Target XML bytes."""
+    return _render_event(
+        _SENSOR_TMPL, _sensor_status_fields, cot_config(config or {}), data
     )
-    cotx.set("sensor_id", sensor_id)
-    callsign = sensor_id
 
-    contact: ET.Element = ET.Element("contact")
-    contact.set("callsign", callsign)
 
-    track: ET.Element = ET.Element("track")
-    track.set("speed", str(data.get("SpeedHorizontal", 0)))
+_TEMPLATES: dict = {
+    "rid_op_to_cot_xml": (_OP_TMPL, _rid_op_fields),
+    "rid_uas_to_cot_xml": (_UAS_TMPL, _rid_uas_fields),
+    "sensor_status_to_cot": (_SENSOR_TMPL, _sensor_status_fields),
+    "rid_op_to_cot_bytes": (_OP_TMPL, _rid_op_fields),
+    "rid_uas_to_cot_bytes": (_UAS_TMPL, _rid_uas_fields),
+    "sensor_status_to_cot_bytes": (_SENSOR_TMPL, _sensor_status_fields),
+}
+_XML_BUILDERS: dict = {
+    "rid_op_to_cot_xml": rid_op_to_cot_xml,
+    "rid_uas_to_cot_xml": rid_uas_to_cot_xml,
+    "sensor_status_to_cot": sensor_status_to_cot,
+}
+
+
+def _xml_builder_to_cot(
+    builder: Callable,
+    config: dict,
+    data: dict,
+    times: Optional[Tuple[str, str]] = None,
+) -> Optional[bytes]:
+    """Build a CoT Event with the given ElementTree builder and serialize it.
 
-    detail = ET.Element("detail")
-    detail.append(contact)
-    detail.append(track)
-    detail.append(cotx)
+    pytak stamps the times of the Events it generates, so times is ignored.
+    """
+    cot: Optional[ET.Element] = builder(data, config)
+    if cot is None:
+        return None
+    return pytak.DEFAULT_XML_DECLARATION + b"\n" + ET.tostring(cot)
 
-    remarks = ET.Element("remarks")
-    remarks_fields.append(f"{cot_host_id}")
-    _remarks = " ".join(list(filter(None, remarks_fields)))
-    remarks.text = _remarks
-    detail.append(remarks)
 
-    cot_d = {
-        "lat": str(lat),
-        "lon": str(lon),
-        "ce": str(data.get("HorizAccuracy", "9999999.0")),
-        "le": str(data.get("VertAccuracy", "9999999.0")),
-        "hae": hae,
-        "uid": cot_uid,
-        "cot_type": cot_type,
-        "stale": cot_stale,
-    }
-    cot = pytak.gen_cot_xml(**cot_d)
-    cot.set("access", config.get("COT_ACCESS", pytak.DEFAULT_COT_ACCESS))
+def cot_renderer(func: str, config: Union[SectionProxy, dict]) -> Callable:
+    """Return a function rendering data as CoT XML bytes with the given builder.
 
-    _detail = cot.findall("detail")[0]
-    flowtags = _detail.findall("_flow-tags_")
-    detail.extend(flowtags)
-    cot.remove(_detail)
-    cot.append(detail)
-
-    return cot
+    The config is resolved once, here, and bound to the returned function, which
+    takes the data to render and optionally the (time, stale) to stamp the Event
+    with, see cot_times(). CoT Events are rendered from string templates,
+    unless COT_RENDER_ET is set, in which case they're built & serialized with
+    the ElementTree builders, stamped with their own times. The *_bytes funcs
+    always render from the templates.
+    """
+    config = cot_config(config)
+    if config["COT_RENDER_ET"] and func in _XML_BUILDERS:
+        return functools.partial(_xml_builder_to_cot, _XML_BUILDERS[func], config)
+    return functools.partial(_render_event, *_TEMPLATES[func], config)
 
 
 def xml_to_cot(
     data: dict, config: Union[SectionProxy, dict, None] = None, func=None
 ) -> Optional[bytes]:
     """Return a CoT XML object as an XML string, using the given func."""
-    cot: Optional[ET.Element] = getattr(dronecot.functions, func)(data, config)
-    return (
-        b"\n".join([pytak.DEFAULT_XML_DECLARATION, ET.tostring(cot)]) if cot else None
-    )
+    return cot_renderer(func, config or {})(data)
+
+
+def _gps_info_expired(config) -> bool:
+    """Check if the cached GPS Info is older than GPS_INFO_TTL seconds."""
+    gps_info_ttl = float(config.get("GPS_INFO_TTL", dronecot.DEFAULT_GPS_INFO_TTL))
+    return time.monotonic() - _GPS_INFO_CACHE["ts"] >= gps_info_ttl
 
 
 def get_gps_info(config) -> Optional[dict]:
-    """Get GPS Info data."""
-    gpspipe_data: Optional[str] = None
-    gps_data: Optional[str] = None
+    """Get GPS Info data, reusing the last result for GPS_INFO_TTL seconds.
+
+    If reading it fails, the last good GPS Info, if any, is returned instead.
+    """
+    if not _gps_info_expired(config):
+        return _GPS_INFO_CACHE["info"]
+
+    gps_info = None
+    try:
+        gps_info = read_gps_info(config)
+    except Exception as e:
+        _LOGGER.warning("Unable to get GPS fix: %s", e)
+
+    # Failures are cached too, so a missing GPS doesn't block every message,
+    # but they don't wipe the last good fix.
+    _GPS_INFO_CACHE["ts"] = time.monotonic()
+    if gps_info:
+        _GPS_INFO_CACHE["info"] = gps_info
+    return _GPS_INFO_CACHE["info"]
+
+
+def cached_gps_info() -> Optional[dict]:
+    """Get the last GPS Info read, however old, without reading it again."""
+    return _GPS_INFO_CACHE["info"]
+
+
+def _kill_gps_info_cmd(proc: asyncio.subprocess.Process) -> None:
+    """Kill GPS_INFO_CMD's shell, and on POSIX its children holding the pipe."""
+    try:
+        if _POSIX:
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def refresh_gps_info(config) -> Optional[dict]:
+    """Refresh the GPS Info cache of get_gps_info() without blocking the loop.
+
+    Runs GPS_INFO_CMD as an asyncio subprocess, if the cached GPS Info expired,
+    and returns the cached GPS Info, which is the last good fix if this failed.
+    """
+    if not _gps_info_expired(config):
+        return _GPS_INFO_CACHE["info"]
+
+    gps_info = None
     gps_info_cmd = config.get("GPS_INFO_CMD", dronecot.DEFAULT_GPS_INFO_CMD)
     try:
-        gpspipe_data = subprocess.check_output(
-            gps_info_cmd, shell=True, timeout=10
-        ).decode()
+        proc = await asyncio.create_subprocess_shell(
+            gps_info_cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=_POSIX,
+        )
+        try:
+            gpspipe_data, _ = await asyncio.wait_for(proc.communicate(), 10)
+        except asyncio.TimeoutError:
+            _kill_gps_info_cmd(proc)
+            await proc.wait()
+            _LOGGER.warning("Unable to get GPS fix, ignoring.")
+        except asyncio.CancelledError:
+            # Don't leave GPS_INFO_CMD running behind a cancelled worker.
+            _kill_gps_info_cmd(proc)
+            raise
+        else:
+            if proc.returncode == 0:
+                gps_info = _parse_gps_info(gpspipe_data)
+    except Exception as e:
+        _LOGGER.warning("Unable to get GPS fix: %s", e)
+
+    # Failures are rate-limited like fixes, but don't wipe the last good fix. A
+    # cancelled refresh leaves the cache untouched.
+    _GPS_INFO_CACHE["ts"] = time.monotonic()
+    if gps_info:
+        _GPS_INFO_CACHE["info"] = gps_info
+    return _GPS_INFO_CACHE["info"]
+
+
+def read_gps_info(config) -> Optional[dict]:
+    """Read GPS Info data from gpspipe."""
+    gpspipe_data: Optional[bytes] = None
+    gps_info_cmd = config.get("GPS_INFO_CMD", dronecot.DEFAULT_GPS_INFO_CMD)
+    try:
+        gpspipe_data = subprocess.check_output(gps_info_cmd, shell=True, timeout=10)
     except subprocess.TimeoutExpired:
-        print("Unable to get GPS fix, ignoring.")
+        _LOGGER.warning("Unable to get GPS fix, ignoring.")
         return None
 
-    if not gpspipe_data:
-        return None
+    return _parse_gps_info(gpspipe_data)
+
 
-    if "\n" in gpspipe_data:
-        for data in gpspipe_data.split("\n"):
-            if "TPV" in data:
-                gps_data = data
-                continue
+def _parse_gps_info(gpspipe_data: Optional[bytes]) -> Optional[dict]:
+    """Parse the last TPV (position) report out of gpspipe's JSON output.
 
-    if not gps_data:
+    The raw output bytes are scanned and decoded as-is, json_loads accepts bytes.
+    """
+    if not gpspipe_data or b"\n" not in gpspipe_data:
         return None
 
-    gps_info = json.loads(gps_data)
-    return gps_info
+    for data in reversed(gpspipe_data.split(b"\n")):
+        if b"TPV" in data:
+            return json_loads(data)
+
+    return None
+
+
+def decode_uasdata(
+    uasdata: Union[str, bytes],
+    valid_blocks: Optional["dronecot.ODIDValidBlocks"] = None,
+) -> dict:
+    """Decode base64 encoded Open Drone ID UASdata into its message fields.
+
+    This is a plain module-level function so that it can be run in an executor.
+    A caller decoding one frame at a time may reuse the same valid_blocks for
+    every frame, as decode_valid_blocks overwrites all of its fields.
+    """
+    # Parse the decoded UAS data through a zero-copy view of its buffer.
+    payload = memoryview(a2b_base64(uasdata))
+    valid_blocks = dronecot.decode_valid_blocks(payload, valid_blocks)
+    return dronecot.parse_payload(payload, valid_blocks)
 
 
 def parse_sensor_data(data):
@@ -419,10 +718,7 @@ def parse_sensor_data(data):
     if not uasdata:
         return
 
-    uasdata = base64.b64decode(uasdata)
-    valid_blocks = dronecot.decode_valid_blocks(uasdata, dronecot.ODIDValidBlocks())
-
-    pl = dronecot.parse_payload(uasdata, valid_blocks)
+    pl = decode_uasdata(uasdata)
 
     # del data["UASdata"]
     pl["data"] = data
@@ -27,65 +27,81 @@
 import datetime
 import struct
 
-import pytz
+# ODID timestamps count seconds from 2019-01-01 00:00 UTC.
+_ODID_EPOCH = 1546300800
+_UTC = datetime.timezone.utc
+_NAN = float("NaN")
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M %Z"
 
-from bitstruct import *
+_U32 = struct.Struct("<I")
+
+# BasicID block: UAType, IDType, followed by the NUL padded UAS ID.
+_BASIC_ID = struct.Struct("<II")
+
+# ID types whose UAS ID is ASCII text: Serial Number (1) and CAA Registration (2).
+_ASCII_IDTYPES = frozenset({1, 2})
+
+# Location block: Status, Direction, SpeedHorizontal, SpeedVertical, Latitude,
+# Longitude, AltitudeBaro, AltitudeGeo, HeightType, Height, HorizAccuracy,
+# VertAccuracy, BaroAccuracy, SpeedAccuracy, TSAccuracy, TimeStamp
+_LOCATION = struct.Struct("<IfffddffIfIIIIIf")
+
+# System block: OperatorLocationType, ClassificationType, OperatorLatitude,
+# OperatorLongitude, AreaCount, AreaRadius, AreaCeiling, AreaFloor, CategoryEU,
+# ClassEU, OperatorAltitudeGeo, Timestamp
+_SYSTEM = struct.Struct("<IIddHHffIIfI")
+
+# AuthPage headers: DataPage, AuthType, and on page 0 also LastPageIndex, Length,
+# Timestamp.
+_AUTH_PAGE = struct.Struct("<B3xB")
+_AUTH_PAGE0 = struct.Struct("<B3xB3xBB2xI")
+
+# Valid block flags: BasicID0, BasicID1, Location, (AuthPage 0-15,) SelfID, System,
+# OperatorID. The AuthPage flags are copied as a whole into AuthValid.
+_VALID_BLOCKS = struct.Struct("<3B16x3B")
 
 
 class ODIDValidBlocks:
     """Valid blocks for Open Drone ID messages."""
 
-    BasicID0_valid = 0
-    BasicID1_valid = 0
-    LocationValid = 0
-    SelfIDValid = 0
-    SystemValid = 0
-    OperatorIDValid = 0
-    AuthValid = [
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-        0,
-    ]
-    # max 13 pages up to 255 bytes data
-
-
-def decode_valid_blocks(payload, valid_blocks):
-    valid_blocks.BasicID0_valid = payload[892]
-    valid_blocks.BasicID1_valid = payload[893]
-    valid_blocks.LocationValid = payload[894]
-    valid_blocks.AuthValid[0] = payload[895]
-    valid_blocks.AuthValid[1] = payload[896]
-    valid_blocks.AuthValid[2] = payload[897]
-    valid_blocks.AuthValid[3] = payload[898]
-    valid_blocks.AuthValid[4] = payload[899]
-    valid_blocks.AuthValid[5] = payload[900]
-    valid_blocks.AuthValid[6] = payload[901]
-    valid_blocks.AuthValid[7] = payload[902]
-    valid_blocks.AuthValid[8] = payload[903]
-    valid_blocks.AuthValid[9] = payload[904]
-    valid_blocks.AuthValid[10] = payload[905]
-    valid_blocks.AuthValid[11] = payload[906]
-    valid_blocks.AuthValid[12] = payload[907]
-    valid_blocks.AuthValid[13] = payload[908]
-    # The current RemoteID standards allow up to 13 pages of Auth data.
-    # valid_blocks.AuthValid[14] = payload[909]
-    # valid_blocks.AuthValid[15] = payload[910]
-    valid_blocks.SelfIDValid = payload[911]
-    valid_blocks.SystemValid = payload[912]
-    valid_blocks.OperatorIDValid = payload[913]
+    __slots__ = (
+        "BasicID0_valid",
+        "BasicID1_valid",
+        "LocationValid",
+        "SelfIDValid",
+        "SystemValid",
+        "OperatorIDValid",
+        "AuthValid",
+    )
+
+    def __init__(self):
+        self.BasicID0_valid = 0
+        self.BasicID1_valid = 0
+        self.LocationValid = 0
+        self.SelfIDValid = 0
+        self.SystemValid = 0
+        self.OperatorIDValid = 0
+        # max 13 pages up to 255 bytes data
+        self.AuthValid = bytearray(16)
+
+
+def _cstr(buf) -> str:
+    """Decode a NUL terminated ASCII string field."""
+    return bytes(buf).partition(b"\x00")[0].decode("ascii")
+
+
+def decode_valid_blocks(payload, valid_blocks=None):
+    if valid_blocks is None:
+        valid_blocks = ODIDValidBlocks()
+    (
+        valid_blocks.BasicID0_valid,
+        valid_blocks.BasicID1_valid,
+        valid_blocks.LocationValid,
+        valid_blocks.SelfIDValid,
+        valid_blocks.SystemValid,
+        valid_blocks.OperatorIDValid,
+    ) = _VALID_BLOCKS.unpack_from(payload, 892)
+    valid_blocks.AuthValid[:] = payload[895:911]
     return valid_blocks
 
 
@@ -93,181 +109,132 @@ def parse_payload(payload, valid_blocks) -> dict:
     """Parse Open Drone ID payload from validaded data."""
     pl: dict = {}
     if valid_blocks.BasicID0_valid == 1:
-        pl = pl | parse_basicID0(payload)
+        pl.update(parse_basicID0(payload))
 
     if valid_blocks.BasicID1_valid == 1:
-        pl = pl | parse_basicID1(payload)
+        pl.update(parse_basicID1(payload))
 
     if valid_blocks.LocationValid == 1:
-        pl = pl | parse_Location(payload)
+        pl.update(parse_Location(payload))
 
     if valid_blocks.SelfIDValid == 1:
-        pl = pl | parse_SelfID(payload)
+        pl.update(parse_SelfID(payload))
 
     if valid_blocks.SystemValid == 1:
-        pl = pl | parse_System(payload)
+        pl.update(parse_System(payload))
 
     if valid_blocks.OperatorIDValid == 1:
-        pl = pl | parse_OperatorID(payload)
+        pl.update(parse_OperatorID(payload))
 
-    for x in range(16):
-        if valid_blocks.AuthValid[x] == 1:
-            pl = pl | parse_AuthPage(payload, x)
+    pl.update(_parse_auth_pages(payload, valid_blocks.AuthValid))
 
-    print("Parsed payload")
-    print(pl)
     return pl
 
 
-def parse_basicID0(payload):
-    pl = {}
-    BasicID0_start_byte = 0
-    [UAType] = struct.unpack(
-        "I", payload[BasicID0_start_byte : BasicID0_start_byte + 4]
-    )
-    [IDType] = struct.unpack(
-        "I", payload[BasicID0_start_byte + 4 : BasicID0_start_byte + 4 + 4]
-    )
-    pl["UAType"] = UAType
-    pl["IDType"] = IDType
-    if IDType == 1 or IDType == 2:
-        pl["BasicID"] = (
-            payload[BasicID0_start_byte + 8 : BasicID0_start_byte + 8 + 21]
-            .decode("ascii")
-            .rstrip("\x00")
-        )
-    else:
-        pl["BasicID"] = (
-            payload[BasicID0_start_byte + 8 : BasicID0_start_byte + 8 + 21].hex(),
-        )
+def _parse_auth_pages(payload, auth_valid) -> dict:
+    """Parse the valid AuthPages, passing page 0's LastPageIndex & Length on."""
+    pl: dict = {}
+    LastPageIndex = None
+    Length = 0
+    for page, valid in enumerate(auth_valid):
+        if valid == 1:
+            page_pl = parse_AuthPage(payload, page, LastPageIndex, Length)
+            if page == 0:
+                LastPageIndex = page_pl["LastPageIndex"]
+                Length = page_pl["Length"]
+            pl.update(page_pl)
     return pl
 
 
-def parse_basicID1(payload):
+def _parse_basicID(payload, BasicID_start_byte):
     pl = {}
-    BasicID1_start_byte = 32
-    [UAType] = struct.unpack(
-        "I", payload[BasicID1_start_byte : BasicID1_start_byte + 4]
-    )
-    [IDType] = struct.unpack(
-        "I", payload[BasicID1_start_byte + 4 : BasicID1_start_byte + 4 + 4]
-    )
+    UAType, IDType = _BASIC_ID.unpack_from(payload, BasicID_start_byte)
     pl["UAType"] = UAType
     pl["IDType"] = IDType
-    if IDType == 1 or IDType == 2:
-        pl["BasicID"] = (
-            payload[BasicID1_start_byte + 8 : BasicID1_start_byte + 8 + 21]
-            .decode("ascii")
-            .rstrip("\x00")
-        )
+    BasicID = payload[BasicID_start_byte + 8 : BasicID_start_byte + 8 + 21]
+    if IDType in _ASCII_IDTYPES:
+        pl["BasicID"] = _cstr(BasicID)
     else:
-        pl["BasicID"] = payload[
-            BasicID1_start_byte + 8 : BasicID1_start_byte + 8 + 21
-        ].hex()
-    print(pl)
+        pl["BasicID"] = BasicID.hex()
     return pl
 
 
+def parse_basicID0(payload):
+    return _parse_basicID(payload, 0)
+
+
+def parse_basicID1(payload):
+    return _parse_basicID(payload, 32)
+
+
 def parse_Location(payload):
     pl = {}
     Location_start_byte = 32 + 32
 
-    [Status] = struct.unpack(
-        "I", payload[Location_start_byte : Location_start_byte + 4]
-    )
-    pl["Status"] = Status
+    (
+        Status,
+        Direction,
+        SpeedHorizontal,
+        SpeedVertical,
+        Latitude,
+        Longitude,
+        AltitudeBaro,
+        AltitudeGeo,
+        HeightType,
+        Height,
+        HorizAccuracy,
+        VertAccuracy,
+        BaroAccuracy,
+        SpeedAccuracy,
+        TSAccuracy,
+        TimeStamp,
+    ) = _LOCATION.unpack_from(payload, Location_start_byte)
 
-    [Direction] = struct.unpack(
-        "f", payload[Location_start_byte + 4 : Location_start_byte + 4 + 4]
-    )
+    pl["Status"] = Status
 
-    if Direction > 360 or Direction < 0:
-        Direction = float("NaN")
+    if not 0 <= Direction <= 360:
+        Direction = _NAN
 
     pl["Direction"] = Direction
 
-    [SpeedHorizontal] = struct.unpack(
-        "f", payload[Location_start_byte + 8 : Location_start_byte + 8 + 4]
-    )
-    if SpeedHorizontal > 254.25 or SpeedHorizontal < 0:
-        SpeedHorizontal = float("NaN")
-    [SpeedVertical] = struct.unpack(
-        "f", payload[Location_start_byte + 12 : Location_start_byte + 12 + 4]
-    )
+    if not 0 <= SpeedHorizontal <= 254.25:
+        SpeedHorizontal = _NAN
     pl["SpeedHorizontal"] = SpeedHorizontal
 
-    if SpeedVertical > 62 or SpeedVertical < -62:
-        SpeedVertical = float("NaN")
+    if not -62 <= SpeedVertical <= 62:
+        SpeedVertical = _NAN
 
     pl["SpeedVertical"] = SpeedVertical
 
-    [Latitude] = struct.unpack(
-        "d", payload[Location_start_byte + 16 : Location_start_byte + 16 + 8]
-    )
-    print("Latitude: ", Latitude)
-    if Latitude == 0.0 or Latitude > 90.0 or Latitude < -90.0:
-        Latitude = float("NaN")
-    [Longitude] = struct.unpack(
-        "d", payload[Location_start_byte + 24 : Location_start_byte + 24 + 8]
-    )
-    if Longitude == 0.0 or Longitude > 180.0 or Longitude < -180.0:
-        Longitude = float("NaN")
+    if Latitude == 0.0 or not -90.0 <= Latitude <= 90.0:
+        Latitude = _NAN
+    if Longitude == 0.0 or not -180.0 <= Longitude <= 180.0:
+        Longitude = _NAN
 
     pl["Latitude"] = Latitude
     pl["Longitude"] = Longitude
 
-    [AltitudeBaro] = struct.unpack(
-        "f", payload[Location_start_byte + 32 : Location_start_byte + 32 + 4]
-    )
-    if AltitudeBaro <= -1000.0 or AltitudeBaro > 31767.5:
-        AltitudeBaro = float("NaN")
-    [AltitudeGeo] = struct.unpack(
-        "f", payload[Location_start_byte + 36 : Location_start_byte + 36 + 4]
-    )
-    if AltitudeGeo <= -1000.0 or AltitudeGeo > 31767.5:
-        AltitudeGeo = float("NaN")
+    if not -1000.0 < AltitudeBaro <= 31767.5:
+        AltitudeBaro = _NAN
+    if not -1000.0 < AltitudeGeo <= 31767.5:
+        AltitudeGeo = _NAN
 
     pl["AltitudeBaro"] = AltitudeBaro
     pl["AltitudeGeo"] = AltitudeGeo
 
-    [HeightType] = struct.unpack(
-        "I ", payload[Location_start_byte + 40 : Location_start_byte + 40 + 4]
-    )
-    [Height] = struct.unpack(
-        "f", payload[Location_start_byte + 44 : Location_start_byte + 44 + 4]
-    )
-    if Height <= -1000.0 or Height > 31767.5:
-        Height = float("NaN")
+    if not -1000.0 < Height <= 31767.5:
+        Height = _NAN
 
     pl["HeightType"] = HeightType
     pl["Height"] = Height
 
-    [HorizAccuracy] = struct.unpack(
-        "I", payload[Location_start_byte + 48 : Location_start_byte + 48 + 4]
-    )
-    [VertAccuracy] = struct.unpack(
-        "I", payload[Location_start_byte + 52 : Location_start_byte + 52 + 4]
-    )
-    [BaroAccuracy] = struct.unpack(
-        "I", payload[Location_start_byte + 56 : Location_start_byte + 56 + 4]
-    )
-    [SpeedAccuracy] = struct.unpack(
-        "I", payload[Location_start_byte + 60 : Location_start_byte + 60 + 4]
-    )
-    [TSAccuracy] = struct.unpack(
-        "I", payload[Location_start_byte + 64 : Location_start_byte + 64 + 4]
-    )
-    [TimeStamp] = struct.unpack(
-        "f", payload[Location_start_byte + 68 : Location_start_byte + 68 + 4]
-    )
-
     pl["HorizAccuracy"] = HorizAccuracy
     pl["VertAccuracy"] = VertAccuracy
     pl["BaroAccuracy"] = BaroAccuracy
     pl["SpeedAccuracy"] = SpeedAccuracy
     pl["TSAccuracy"] = TSAccuracy
 
-    if TimeStamp != float("NaN") and TimeStamp > 0 and TimeStamp <= 60 * 60:
+    if 0 < TimeStamp <= 60 * 60:
         pl["TimeStamp"] = (
             int(TimeStamp / 60),
             int(TimeStamp % 60),
@@ -279,75 +246,49 @@ def parse_Location(payload):
 def parse_SelfID(payload):
     pl = {}
     SelfID_start_byte = 776
-    [DescType] = struct.unpack("I", payload[SelfID_start_byte : SelfID_start_byte + 4])
+    [DescType] = _U32.unpack_from(payload, SelfID_start_byte)
     Desc = payload[SelfID_start_byte + 4 : SelfID_start_byte + 4 + 23]
     pl["DescType"] = DescType
-    pl["Desc"] = Desc.decode("ascii").rstrip("\x00")
+    pl["Desc"] = _cstr(Desc)
     return pl
 
 
 def parse_System(payload):
     pl = {}
     System_start_byte = 808
-    [OperatorLocationType] = struct.unpack(
-        "I", payload[System_start_byte : System_start_byte + 4]
-    )
-    [ClassificationType] = struct.unpack(
-        "I", payload[System_start_byte + 4 : System_start_byte + 4 + 4]
-    )
+
+    (
+        OperatorLocationType,
+        ClassificationType,
+        OperatorLatitude,
+        OperatorLongitude,
+        AreaCount,
+        AreaRadius,
+        AreaCeiling,
+        AreaFloor,
+        CategoryEU,
+        ClassEU,
+        OperatorAltitudeGeo,
+        Timestamp,
+    ) = _SYSTEM.unpack_from(payload, System_start_byte)
 
     pl["OperatorLocationType"] = OperatorLocationType
     pl["ClassificationType"] = ClassificationType
 
-    [OperatorLatitude] = struct.unpack(
-        "d", payload[System_start_byte + 8 : System_start_byte + 8 + 8]
-    )
-    [OperatorLongitude] = struct.unpack(
-        "d", payload[System_start_byte + 16 : System_start_byte + 16 + 8]
-    )
-
-    if OperatorLatitude == 0.0 or OperatorLatitude > 90.0 or OperatorLatitude < -90.0:
-        OperatorLatitude = float("NaN")
-    if (
-        OperatorLongitude == 0.0
-        or OperatorLongitude > 180.0
-        or OperatorLongitude < -180.0
-    ):
-        OperatorLongitude = float("NaN")
+    if OperatorLatitude == 0.0 or not -90.0 <= OperatorLatitude <= 90.0:
+        OperatorLatitude = _NAN
+    if OperatorLongitude == 0.0 or not -180.0 <= OperatorLongitude <= 180.0:
+        OperatorLongitude = _NAN
 
     pl["OperatorLatitude"] = OperatorLatitude
     pl["OperatorLongitude"] = OperatorLongitude
 
-    [AreaCount] = struct.unpack(
-        "H", payload[System_start_byte + 24 : System_start_byte + 24 + 2]
-    )
-    [AreaRadius] = struct.unpack(
-        "H", payload[System_start_byte + 26 : System_start_byte + 26 + 2]
-    )
-    [AreaCeiling] = struct.unpack(
-        "f", payload[System_start_byte + 28 : System_start_byte + 28 + 4]
-    )
     if AreaCeiling == -1000:
-        AreaCeiling = float("NaN")
-    [AreaFloor] = struct.unpack(
-        "f", payload[System_start_byte + 32 : System_start_byte + 32 + 4]
-    )
+        AreaCeiling = _NAN
     if AreaFloor == -1000:
-        AreaFloor = float("NaN")
-    [CategoryEU] = struct.unpack(
-        "I", payload[System_start_byte + 36 : System_start_byte + 36 + 4]
-    )
-    [ClassEU] = struct.unpack(
-        "I", payload[System_start_byte + 40 : System_start_byte + 40 + 4]
-    )
-    [OperatorAltitudeGeo] = struct.unpack(
-        "f", payload[System_start_byte + 44 : System_start_byte + 44 + 4]
-    )
-    if OperatorAltitudeGeo <= -1000.0 or OperatorAltitudeGeo > 31767.5:
-        OperatorAltitudeGeo = float("NaN")
-    [Timestamp] = struct.unpack(
-        "I", payload[System_start_byte + 48 : System_start_byte + 48 + 4]
-    )
+        AreaFloor = _NAN
+    if not -1000.0 < OperatorAltitudeGeo <= 31767.5:
+        OperatorAltitudeGeo = _NAN
 
     pl["AreaCount"] = AreaCount
     pl["AreaRadius"] = AreaRadius
@@ -357,11 +298,11 @@ def parse_System(payload):
     pl["ClassEU"] = ClassEU
     pl["OperatorAltitudeGeo"] = OperatorAltitudeGeo
 
-    if Timestamp != float("NaN") and Timestamp != 0:
+    if Timestamp:
         pl["Timestamp"] = (
-            datetime.datetime.fromtimestamp(
-                (int(Timestamp) + 1546300800), pytz.UTC
-            ).strftime("%Y-%m-%d %H:%M %Z"),
+            datetime.datetime.fromtimestamp(Timestamp + _ODID_EPOCH, _UTC).strftime(
+                _TIMESTAMP_FORMAT
+            ),
         )
     pl["TimestampRaw"] = Timestamp
     return pl
@@ -371,63 +312,53 @@ def parse_OperatorID(payload):
     pl = {}
     OperatorID_start_byte = 864
 
-    [OperatorIdType] = struct.unpack(
-        "I", payload[OperatorID_start_byte : OperatorID_start_byte + 4]
-    )
+    [OperatorIdType] = _U32.unpack_from(payload, OperatorID_start_byte)
     pl["OperatorIdType"] = OperatorIdType
-    pl["OperatorID"] = (
+    pl["OperatorID"] = _cstr(
         payload[OperatorID_start_byte + 4 : OperatorID_start_byte + 4 + 20]
-        .decode("ascii")
-        .rstrip("\x00")
     )
     return pl
 
 
-def parse_AuthPage(payload, page):
+def parse_AuthPage(payload, page, LastPageIndex=None, Length=0):
     pl = {}
     AuthPage_start_byte = 136 + 40 * page
 
-    [DataPage] = struct.unpack(
-        "B", payload[AuthPage_start_byte + 0 : AuthPage_start_byte + 1]
-    )
-    [AuthType] = struct.unpack(
-        "B", payload[AuthPage_start_byte + 4 : AuthPage_start_byte + 5]
-    )
+    if page == 0:
+        (
+            DataPage,
+            AuthType,
+            LastPageIndex,
+            Length,
+            Timestamp,
+        ) = _AUTH_PAGE0.unpack_from(payload, AuthPage_start_byte)
+    else:
+        DataPage, AuthType = _AUTH_PAGE.unpack_from(payload, AuthPage_start_byte)
+
     pl["DataPage"] = DataPage
     pl["AuthType"] = AuthType
 
     if page == 0:
-        global LastPageIndex
-        global Length
-
-        [LastPageIndex] = struct.unpack(
-            "B", payload[AuthPage_start_byte + 8 : AuthPage_start_byte + 9]
-        )
-        [Length] = struct.unpack(
-            "B", payload[AuthPage_start_byte + 9 : AuthPage_start_byte + 10]
-        )
-        [Timestamp] = struct.unpack(
-            "I", payload[AuthPage_start_byte + 12 : AuthPage_start_byte + 12 + 4]
-        )
-
         pl["LastPageIndex"] = LastPageIndex
         pl["Length"] = Length
 
-        if Timestamp != float("NaN") and Timestamp != 0:
+        if Timestamp:
             pl["Timestamp"] = datetime.datetime.fromtimestamp(
-                (int(Timestamp) + 1546300800), pytz.UTC
-            ).strftime("%Y-%m-%d %H:%M %Z")
+                Timestamp + _ODID_EPOCH, _UTC
+            ).strftime(_TIMESTAMP_FORMAT)
 
         AuthData = payload[AuthPage_start_byte + 16 : AuthPage_start_byte + 16 + 17]
         pl["AuthData"] = AuthData.hex()
 
     else:
         if page == LastPageIndex:
-            # only print the chars within the specified length of the pages auth message
+            # Only the bytes of the Length long auth data left after page 0's 17
+            # and the 23 of each page in between.
+            last_length = min(max(Length - 17 - 23 * (page - 1), 0), 23)
             AuthData = payload[
-                AuthPage_start_byte + 16 : AuthPage_start_byte + 16 + (Length - 17) % 23
+                AuthPage_start_byte + 16 : AuthPage_start_byte + 16 + last_length
             ]
         else:
             AuthData = payload[AuthPage_start_byte + 16 : AuthPage_start_byte + 16 + 23]
-            pl["AuthData"] = AuthData.hex()
+        pl["AuthData"] = AuthData.hex()
     return pl
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""DroneCOT Class Tests."""
+
+import asyncio
+import configparser
+import lzma
+import math
+import os
+import time
+import unittest
+
+import xml.etree.ElementTree as ET
+
+import dronecot
+
+
+def make_mqtt_worker():
+    """Create an MQTTWorker which records the JSON objects it would handle."""
+    config = configparser.ConfigParser()
+    config["dronecot"] = {}
+    worker = dronecot.MQTTWorker(asyncio.Queue(), config["dronecot"])
+    worker.handled = []
+
+    async def handle_json(json_obj, topic):
+        worker.handled.append(json_obj)
+
+    worker.handle_json = handle_json
+    return worker
+
+
+class MQTTWorkerPayloadTestCase(unittest.IsolatedAsyncioTestCase):
+    """
+    Test decoding & splitting of MQTT message payloads.
+    """
+
+    async def asyncSetUp(self):
+        self.worker = make_mqtt_worker()
+
+    async def handle_payload(self, payload):
+        payload = await self.worker.decode_payload(payload)
+        await self.worker.process_payload(payload, "test")
+        return self.worker.handled
+
+    async def test_single(self):
+        handled = await self.handle_payload(b'{"a": 1}')
+        self.assertEqual(handled, [{"a": 1}])
+
+    async def test_leading_whitespace(self):
+        handled = await self.handle_payload(b' {"a": 1}')
+        self.assertEqual(handled, [{"a": 1}])
+        handled = await self.handle_payload(b'\r\n{"b": 2}')
+        self.assertEqual(handled, [{"a": 1}, {"b": 2}])
+
+    async def test_nul_newline_terminated(self):
+        handled = await self.handle_payload(b'{"a": 1}\x00')
+        self.assertEqual(handled, [{"a": 1}])
+        handled = await self.handle_payload(b'{"b": 2}\n')
+        self.assertEqual(handled, [{"a": 1}, {"b": 2}])
+
+    async def test_concatenated(self):
+        handled = await self.handle_payload(b'{"a": 1}{"b": 2}{"c": 3}\n')
+        self.assertEqual(handled, [{"a": 1}, {"b": 2}, {"c": 3}])
+
+    async def test_whitespace_separated(self):
+        handled = await self.handle_payload(b'{"a": 1}\n{"b": 2} {"c": 3}')
+        self.assertEqual(handled, [{"a": 1}, {"b": 2}, {"c": 3}])
+
+    async def test_nan_framing(self):
+        # Accepted the same way, whether a payload holds one object or several.
+        handled = await self.handle_payload(b'{"a": NaN}')
+        handled = await self.handle_payload(b'{"b": 2}{"c": Infinity}')
+        self.assertEqual(len(handled), 3)
+        self.assertTrue(math.isnan(handled[0]["a"]))
+        self.assertEqual(handled[1], {"b": 2})
+        self.assertEqual(handled[2], {"c": float("inf")})
+
+    async def test_lzma_xz(self):
+        handled = await self.handle_payload(lzma.compress(b'{"a": 1}{"b": 2}\x00'))
+        self.assertEqual(handled, [{"a": 1}, {"b": 2}])
+
+    async def test_lzma_alone(self):
+        payload = lzma.compress(b'{"a": 1}\x00', format=lzma.FORMAT_ALONE)
+        handled = await self.handle_payload(payload)
+        self.assertEqual(handled, [{"a": 1}])
+
+    async def test_lzma_corrupt(self):
+        payload = await self.worker.decode_payload(b"\xfd7zXZ\x00garbage")
+        self.assertIsNone(payload)
+
+    async def test_lzma_alone_custom_properties(self):
+        # Legacy .lzma streams with non-default lc/lp/pb don't start with 0x5D.
+        filters = [{"id": lzma.FILTER_LZMA1, "lc": 0, "lp": 0, "pb": 0}]
+        payload = lzma.compress(b'{"a": 1}', format=lzma.FORMAT_ALONE, filters=filters)
+        self.assertFalse(payload.startswith(b"\x5d"))
+        handled = await self.handle_payload(payload)
+        self.assertEqual(handled, [{"a": 1}])
+
+    async def test_binary(self):
+        payload = await self.worker.decode_payload(b"\x89PNG\r\n\x1a\n\x00\x00")
+        self.assertIsNone(payload)
+
+    async def test_not_utf8(self):
+        handled = await self.handle_payload(b'{"a": 1} \xff\xfe')
+        self.assertEqual(handled, [])
+
+    async def test_invalid_json(self):
+        handled = await self.handle_payload(b'{"a": 1}{"b": ')
+        self.assertEqual(handled, [{"a": 1}])
+
+
+GPS_INFO_CMD = (
+    "printf '%s\\n' '{\"class\":\"VERSION\"}' "
+    '\'{"class":"TPV","lat":10.5,"lon":20.25,"altHAE":7.0}\''
+)
+
+
+def make_rid_worker(gps_info_cmd):
+    """Create a RIDWorker with the given GPS_INFO_CMD and an empty GPS cache."""
+    dronecot.functions._GPS_INFO_CACHE.update(ts=float("-inf"), info=None)
+    config = configparser.ConfigParser(interpolation=None)
+    config["dronecot"] = {"GPS_INFO_CMD": gps_info_cmd, "COT_HOST_ID": "test_host"}
+    return dronecot.RIDWorker(asyncio.Queue(), asyncio.Queue(), config["dronecot"])
+
+
+def make_status():
+    """Create a status from a sensor without a position."""
+    return {"sensor_id": "S1", "status": {"model": "m"}, "topic": "a/b/S1/status"}
+
+
+@unittest.skipUnless(os.name == "posix", "GPS_INFO_CMD uses a POSIX shell")
+class RIDWorkerGPSTestCase(unittest.IsolatedAsyncioTestCase):
+    """
+    Test the GPS fix fallback of RIDWorker for sensors without a position.
+    """
+
+    async def asyncTearDown(self):
+        dronecot.functions._GPS_INFO_CACHE.update(ts=float("-inf"), info=None)
+
+    async def test_background_refresh(self):
+        worker = make_rid_worker(GPS_INFO_CMD)
+
+        # No fix cached yet: the status is skipped while the refresh runs.
+        await worker.handle_data(make_status())
+        self.assertTrue(worker.queue.empty())
+        await worker._gps_refresh
+
+        await worker.handle_data(make_status())
+        cot_xml = ET.fromstring(worker.queue.get_nowait())
+        self.assertEqual(cot_xml.get("uid"), "SNSTAC-CUAS.S1")
+        self.assertEqual(cot_xml.find("point").get("lat"), "10.5")
+        self.assertEqual(cot_xml.find("point").get("lon"), "20.25")
+        self.assertEqual(cot_xml.find("point").get("hae"), "7.0")
+
+    async def test_slow_gps_info_cmd(self):
+        worker = make_rid_worker("sleep 5")
+        dronecot.functions._GPS_INFO_CACHE["info"] = {"lat": 1.5, "lon": 2.5}
+
+        # Rendered from the expired cached fix, without waiting on the command.
+        started = time.monotonic()
+        await worker.handle_data(make_status())
+        await worker.handle_data(make_status())
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(worker.queue.qsize(), 2)
+        cot_xml = ET.fromstring(worker.queue.get_nowait())
+        self.assertEqual(cot_xml.find("point").get("lat"), "1.5")
+
+        refresh = worker._gps_refresh
+        await asyncio.sleep(0.2)
+        self.assertFalse(refresh.done())
+        refresh.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await refresh
+
+        # The cancelled refresh leaves the cached fix, and its age, as they were.
+        self.assertEqual(dronecot.functions.cached_gps_info(), {"lat": 1.5, "lon": 2.5})
+        self.assertEqual(dronecot.functions._GPS_INFO_CACHE["ts"], float("-inf"))
+
+    async def test_stopped_worker_cancels_gps_info_cmd(self):
+        worker = make_rid_worker("sleep 5")
+        worker.net_queue.put_nowait(make_status())
+        run = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.2)
+
+        refresh = worker._gps_refresh
+        self.assertFalse(refresh.done())
+        run.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await run
+        with self.assertRaises(asyncio.CancelledError):
+            await refresh
+
+    async def test_failed_gps_info_cmd(self):
+        worker = make_rid_worker("exit 1")
+        dronecot.functions._GPS_INFO_CACHE["info"] = {"lat": 1.5, "lon": 2.5}
+
+        await worker.handle_data(make_status())
+        await worker._gps_refresh
+
+        # The failure is rate-limited, but the last good fix is still used.
+        self.assertGreater(dronecot.functions._GPS_INFO_CACHE["ts"], float("-inf"))
+        await worker.handle_data(make_status())
+        self.assertEqual(worker.queue.qsize(), 2)
+        for _ in range(2):
+            cot_xml = ET.fromstring(worker.queue.get_nowait())
+            self.assertEqual(cot_xml.find("point").get("lat"), "1.5")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,9 +16,12 @@
 
 """DroneCOT Function Tests."""
 
+import functools
 import json
 import os
 import random
+import shlex
+import tempfile
 import unittest
 
 import xml.etree.ElementTree as ET
@@ -27,29 +30,39 @@ import dronecot
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def iter_json(payload):
+    """Yield each JSON object of a payload of concatenated JSON objects."""
+    end = len(payload)
+    idx = 0
+    while idx < end:
+        if payload[idx].isspace():
+            idx += 1
+            continue
+
+        json_obj, idx = _JSON_DECODER.raw_decode(payload, idx)
+        yield json_obj
+
+
+@functools.lru_cache(maxsize=None)
+def _read_lines(file_path):
+    """Read the lines of a test data file once, across all tests."""
+    with open(f"{THIS_DIR}/{file_path}", "r", encoding="utf-8") as file:
+        return tuple(file.readlines())
+
 
 def load_random_test_data(file_path):
     json_obj = None
     topic = "test"
 
-    with open(file_path, "r", encoding="utf-8") as file:
-        _payload = file.readlines()
-        payload = random.choice(_payload)
-
-        json_end_position = 0
-        while json_end_position != -1:
-            message_payload = payload
-
-            # Look for the next JSON object in the payload, which is (sometimes)
-            # separated by "}{". If found, split the payload at that position.
-            json_end_position = payload.find("}{")
-            if json_end_position != -1:
-                message_payload = payload[0 : json_end_position + 1]
-                # Start payload over at the next JSON object
-                payload = payload[json_end_position + 1 :]
+    payload = random.choice(_read_lines(file_path))
 
-            json_obj = json.loads(message_payload)
-            json_obj["topic"] = topic
+    # The payload (sometimes) holds several JSON objects separated by "}{",
+    # keep the last one.
+    for json_obj in iter_json(payload):
+        json_obj["topic"] = topic
 
     return json_obj
 
@@ -58,26 +71,27 @@ def load_sample_data(file_path, line=0):
     json_obj = None
     topic = "test"
 
-    with open(f"{THIS_DIR}/{file_path}", "r", encoding="utf-8") as file:
-        _payload = file.readlines()
-        payload = _payload[line]
+    payload = _read_lines(file_path)[line]
 
-        json_end_position = 0
-        while json_end_position != -1:
-            message_payload = payload
+    # The payload (sometimes) holds several JSON objects separated by "}{",
+    # keep the last one.
+    for json_obj in iter_json(payload):
+        json_obj["topic"] = topic
 
-            # Look for the next JSON object in the payload, which is (sometimes)
-            # separated by "}{". If found, split the payload at that position.
-            json_end_position = payload.find("}{")
-            if json_end_position != -1:
-                message_payload = payload[0 : json_end_position + 1]
-                # Start payload over at the next JSON object
-                payload = payload[json_end_position + 1 :]
+    return json_obj
 
-            json_obj = json.loads(message_payload)
-            json_obj["topic"] = topic
 
-    return json_obj
+_TIME_ATTRS = {"time", "start", "stale", "production_time"}
+
+
+def cot_tree(cot):
+    """Reduce a CoT Event to a comparable tree, leaving out its time values."""
+    attrib = {
+        key: value
+        for key, value in cot.attrib.items()
+        if key not in _TIME_ATTRS and cot.tag != "_flow-tags_"
+    }
+    return (cot.tag, attrib, cot.text, [cot_tree(child) for child in cot])
 
 
 class FunctionsTestCase(unittest.TestCase):
@@ -85,8 +99,9 @@ class FunctionsTestCase(unittest.TestCase):
     Test class for functions... functions.
     """
 
-    def setUp(self):
-        self.test_data = load_random_test_data("data/WiFi.json")
+    @classmethod
+    def setUpClass(cls):
+        cls.test_data = load_random_test_data("data/WiFi-NaN.json")
 
     def test_wifi_nan_et(self):
         sample_data = load_sample_data("data/WiFi-NaN.json")
@@ -248,6 +263,160 @@ class FunctionsTestCase(unittest.TestCase):
         self.assertEqual(cuas.get("mac_address"), "DF:72:11:D2:6B:95")
         self.assertEqual(cuas.get("type"), "BLE long range")
 
+    def test_wifi_nan_bytes(self):
+        sample_data = load_sample_data("data/WiFi-NaN.json")
+
+        sample_config = {
+            "COT_STALE": "600",
+            "COT_HOST_ID": "test_host",
+            "COT_ACCESS": "test_access",
+        }
+
+        parsed_data = dronecot.functions.parse_sensor_data(sample_data)
+        cot_bytes = dronecot.xml_to_cot(
+            parsed_data, sample_config, "rid_uas_to_cot_xml"
+        )
+        self.assertIsNotNone(cot_bytes)
+        self.assertTrue(cot_bytes.startswith(b"<?xml"))
+
+        cot_xml = ET.fromstring(cot_bytes)
+        self.assertEqual(cot_xml.get("uid"), "RID.1787F04BM24010011195.uas")
+        self.assertEqual(cot_xml.get("type"), "a-n-A-M-H-Q")
+        self.assertEqual(cot_xml.get("access"), sample_config["COT_ACCESS"])
+
+        point = cot_xml.find("point")
+        self.assertEqual(point.get("lat"), "37.759979")
+        self.assertEqual(point.get("lon"), "-122.497734")
+        self.assertEqual(point.get("hae"), "28.0")
+
+        detail = cot_xml.find("detail")
+        self.assertEqual(detail.find("contact").get("callsign"), "1787F04BM24010011195")
+        self.assertEqual(detail.find("__cuas").get("mac_address"), "7A:60:B8:80:BE:E4")
+        self.assertIsNotNone(detail.find("_flow-tags_"))
+
+    def test_templates_match_et(self):
+        sample_config = {
+            "COT_STALE": "600",
+            "COT_HOST_ID": 'test<host> & "co"',
+            "COT_ACCESS": "test_access",
+        }
+
+        compared = 0
+        for file_path in (
+            "data/BLE-legacy.json",
+            "data/BLE-long_range.json",
+            "data/WiFi-NaN.json",
+            "data/WiFi-beacon.json",
+        ):
+            for line in _read_lines(file_path):
+                for json_obj in iter_json(line):
+                    json_obj["topic"] = "test"
+                    parsed_data = dronecot.functions.parse_sensor_data(json_obj)
+                    status_data = {
+                        "sensor_id": json_obj["data"].get("sensor ID"),
+                        "status": {"model": "<SNSTAC & co>", "status": '"ok"'},
+                        "lat": parsed_data.get("Latitude"),
+                        "lon": parsed_data.get("Longitude"),
+                        "altHAE": parsed_data.get("AltitudeGeo"),
+                    }
+                    for func, data in (
+                        ("rid_uas_to_cot_xml", parsed_data),
+                        ("rid_op_to_cot_xml", parsed_data),
+                        ("sensor_status_to_cot", status_data),
+                    ):
+                        with self.subTest(file_path=file_path, func=func):
+                            cot_bytes = dronecot.xml_to_cot(data, sample_config, func)
+                            cot_xml = dronecot.functions._XML_BUILDERS[func](
+                                data, sample_config
+                            )
+                            self.assertIsNotNone(cot_bytes)
+                            self.assertEqual(
+                                cot_tree(ET.fromstring(cot_bytes)), cot_tree(cot_xml)
+                            )
+                            compared += 1
+
+        self.assertGreater(compared, 0)
+
+
+@unittest.skipUnless(os.name == "posix", "GPS_INFO_CMD uses a POSIX shell")
+class GPSInfoTestCase(unittest.TestCase):
+    """
+    Test the GPS fix fallback of sensor status CoT for sensors without a position.
+    """
+
+    def setUp(self):
+        dronecot.functions._GPS_INFO_CACHE.update(ts=float("-inf"), info=None)
+        calls = tempfile.NamedTemporaryFile(delete=False)
+        calls.close()
+        self.calls_path = calls.name
+        self.addCleanup(os.unlink, self.calls_path)
+        self.addCleanup(
+            dronecot.functions._GPS_INFO_CACHE.update, ts=float("-inf"), info=None
+        )
+
+    def gps_info_cmd(self, lat):
+        """Get a GPS_INFO_CMD printing a TPV report at lat & counting its calls."""
+        version = json.dumps({"class": "VERSION"})
+        tpv = json.dumps({"class": "TPV", "lat": lat, "lon": 20.25, "altHAE": 7.0})
+        return (
+            f"echo >> {self.calls_path}; "
+            f"printf '%s\\n' {shlex.quote(version)} {shlex.quote(tpv)}"
+        )
+
+    def calls(self):
+        with open(self.calls_path, "r", encoding="utf-8") as file:
+            return len(file.readlines())
+
+    def status_point(self, config):
+        status = {"sensor_id": "S1", "status": {"model": "m", "status": "ok"}}
+        cot_xml = dronecot.functions.sensor_status_to_cot(status, config)
+        return None if cot_xml is None else cot_xml.find("point")
+
+    def test_cached_fix(self):
+        config = {"GPS_INFO_CMD": self.gps_info_cmd(10.5), "GPS_INFO_TTL": "60"}
+
+        point = self.status_point(config)
+        self.assertEqual(point.get("lat"), "10.5")
+        self.assertEqual(point.get("lon"), "20.25")
+        self.assertEqual(point.get("hae"), "7.0")
+
+        # Within GPS_INFO_TTL the fix is reused, GPS_INFO_CMD isn't run again.
+        config["GPS_INFO_CMD"] = self.gps_info_cmd(11.5)
+        self.assertEqual(self.status_point(config).get("lat"), "10.5")
+        self.assertEqual(self.calls(), 1)
+
+    def test_expired_fix(self):
+        config = {"GPS_INFO_CMD": self.gps_info_cmd(10.5), "GPS_INFO_TTL": "0"}
+        self.assertEqual(self.status_point(config).get("lat"), "10.5")
+
+        config["GPS_INFO_CMD"] = self.gps_info_cmd(11.5)
+        self.assertEqual(self.status_point(config).get("lat"), "11.5")
+        self.assertEqual(self.calls(), 2)
+
+    def test_cached_failure(self):
+        config = {"GPS_INFO_CMD": f"echo >> {self.calls_path}; exit 3"}
+        self.assertIsNone(self.status_point(config))
+
+        # The failure is cached too, so GPS_INFO_CMD isn't run for every status.
+        config["GPS_INFO_CMD"] = self.gps_info_cmd(10.5)
+        self.assertIsNone(self.status_point(config))
+        self.assertEqual(self.calls(), 1)
+
+    def test_failure_keeps_fix(self):
+        config = {"GPS_INFO_CMD": self.gps_info_cmd(10.5), "GPS_INFO_TTL": "0"}
+        self.assertEqual(self.status_point(config).get("lat"), "10.5")
+
+        config["GPS_INFO_CMD"] = f"echo >> {self.calls_path}; exit 3"
+        self.assertEqual(self.status_point(config).get("lat"), "10.5")
+        self.assertEqual(self.calls(), 2)
+
+    def test_status_with_position(self):
+        status = {"sensor_id": "S1", "status": {}, "lat": 1.5, "lon": 2.5}
+        config = {"GPS_INFO_CMD": self.gps_info_cmd(10.5)}
+        cot_xml = dronecot.functions.sensor_status_to_cot(status, config)
+        self.assertEqual(cot_xml.find("point").get("lat"), "1.5")
+        self.assertEqual(self.calls(), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
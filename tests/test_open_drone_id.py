@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com/
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""DroneCOT Open Drone ID Tests."""
+
+import struct
+import unittest
+
+import dronecot
+
+# Offsets of the ODID blocks & their valid flags in a decoded UASdata payload.
+PAYLOAD_LENGTH = 914
+BASIC_ID0_VALID = 892
+AUTH_VALID = 895
+LOCATION_VALID = 894
+
+
+def make_payload():
+    """Create an empty decoded UASdata payload, with no valid blocks."""
+    return bytearray(PAYLOAD_LENGTH)
+
+
+def set_auth_page(payload, page, auth_data, auth_type=1, **page0):
+    """Write the given AuthPage into the payload and flag it valid."""
+    start = 136 + 40 * page
+    payload[start] = page
+    payload[start + 4] = auth_type
+    if page == 0:
+        struct.pack_into(
+            "<BB2xI",
+            payload,
+            start + 8,
+            page0["LastPageIndex"],
+            page0["Length"],
+            page0["Timestamp"],
+        )
+    payload[start + 16 : start + 16 + len(auth_data)] = auth_data
+    payload[AUTH_VALID + page] = 1
+
+
+def parse(payload):
+    """Decode the valid blocks of the payload and parse it."""
+    payload = memoryview(bytes(payload))
+    return dronecot.parse_payload(payload, dronecot.decode_valid_blocks(payload))
+
+
+class OpenDroneIDTestCase(unittest.TestCase):
+    """
+    Test parsing of Open Drone ID payloads.
+    """
+
+    def test_auth_pages(self):
+        payload = make_payload()
+        # 45 bytes of auth data: 17 on page 0, 23 on page 1, 5 on page 2.
+        auth_data = bytes(range(1, 46))
+        set_auth_page(
+            payload,
+            0,
+            auth_data[:17],
+            LastPageIndex=2,
+            Length=45,
+            Timestamp=86400,
+        )
+        set_auth_page(payload, 1, auth_data[17:40])
+        set_auth_page(payload, 2, auth_data[40:] + b"\xff" * 18)
+
+        pl = dronecot.open_drone_id.parse_AuthPage(payload, 1, 2, 45)
+        self.assertEqual(pl["AuthData"], auth_data[17:40].hex())
+
+        pl = parse(payload)
+        self.assertEqual(pl["LastPageIndex"], 2)
+        self.assertEqual(pl["Length"], 45)
+        self.assertEqual(pl["Timestamp"], "2019-01-02 00:00 UTC")
+        # Later pages overwrite the keys of earlier ones, the last page's data is
+        # trimmed to the auth data Length.
+        self.assertEqual(pl["DataPage"], 2)
+        self.assertEqual(pl["AuthType"], 1)
+        self.assertEqual(pl["AuthData"], auth_data[40:].hex())
+
+    def test_auth_pages_full_last_page(self):
+        payload = make_payload()
+        set_auth_page(payload, 0, b"\x01" * 17, LastPageIndex=1, Length=40, Timestamp=0)
+        set_auth_page(payload, 1, b"\x02" * 23)
+
+        pl = parse(payload)
+        self.assertNotIn("Timestamp", pl)
+        self.assertEqual(pl["AuthData"], (b"\x02" * 23).hex())
+
+    def test_auth_pages_without_page0(self):
+        payload = make_payload()
+        set_auth_page(payload, 1, b"\x02" * 23)
+
+        pl = parse(payload)
+        self.assertNotIn("LastPageIndex", pl)
+        self.assertEqual(pl["DataPage"], 1)
+        self.assertEqual(pl["AuthData"], (b"\x02" * 23).hex())
+
+    def test_basic_id_ascii(self):
+        payload = make_payload()
+        struct.pack_into("<II21s", payload, 0, 2, 1, b"1787F04BM24010011195")
+        payload[BASIC_ID0_VALID] = 1
+
+        pl = parse(payload)
+        self.assertEqual(pl["UAType"], 2)
+        self.assertEqual(pl["IDType"], 1)
+        self.assertEqual(pl["BasicID"], "1787F04BM24010011195")
+
+    def test_basic_id_not_ascii(self):
+        # A UTM assigned UUID (IDType 3) is binary, it is passed on as hex text.
+        uuid = bytes.fromhex("0123456789abcdef0123456789abcdef")
+        payload = make_payload()
+        struct.pack_into("<II21s", payload, 0, 2, 3, uuid)
+        payload[BASIC_ID0_VALID] = 1
+        struct.pack_into("<dd", payload, 80, 37.5, -122.5)
+        payload[LOCATION_VALID] = 1
+
+        pl = parse(payload)
+        self.assertEqual(pl["IDType"], 3)
+        self.assertIsInstance(pl["BasicID"], str)
+        self.assertEqual(pl["BasicID"], (uuid + bytes(5)).hex())
+
+        cot_xml = dronecot.functions.rid_uas_to_cot_xml(pl)
+        self.assertEqual(cot_xml.get("uid"), f"RID.{pl['BasicID']}.uas")
+
+    def test_no_valid_blocks(self):
+        self.assertEqual(parse(make_payload()), {})